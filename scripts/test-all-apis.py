@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Run the DeepSeek, Qwen3 and Qwen3-235B API tests as one suite
+
+The three test scripts are loaded as modules and their main_async() coroutines
+run concurrently on a single event loop, so the providers' network waits
+overlap instead of adding up. Scripts that talk to the same host share a
+semaphore to avoid tripping that host's rate limits.
+"""
+
+import os
+import sys
+import asyncio
+import argparse
+import importlib.util
+import logging
+from pathlib import Path
+from typing import List, Optional
+from urllib.parse import urlparse
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("api-test-suite")
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+DEFAULT_PER_HOST_LIMIT = 1
+
+def _load_script(name: str, filename: str):
+    """Import one of the hyphenated test scripts as a module."""
+    spec = importlib.util.spec_from_file_location(name, SCRIPT_DIR / filename)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+async def _run_script(name: str, main_async, argv: List[str], sem: asyncio.Semaphore):
+    """
+    Run one script's main_async() under its host semaphore.
+
+    Returns:
+        Tuple of (name, exit code).
+    """
+    async with sem:
+        logger.info("Running %s tests...", name)
+        try:
+            return name, await main_async(argv)
+        except SystemExit as e:  # argparse errors exit instead of returning
+            return name, e.code if isinstance(e.code, int) else 1
+
+def parse_arguments(argv: Optional[List[str]] = None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Run all LLM API connectivity tests concurrently")
+
+    parser.add_argument(
+        "--skip-rate-limits",
+        action="store_true",
+        help="Skip the DeepSeek rate limit test"
+    )
+    parser.add_argument(
+        "--per-host-limit",
+        type=int,
+        default=DEFAULT_PER_HOST_LIMIT,
+        help=f"Maximum number of scripts running against the same host (default: {DEFAULT_PER_HOST_LIMIT})"
+    )
+
+    return parser.parse_args(argv)
+
+async def main_async(argv: Optional[List[str]] = None) -> int:
+    """Run every script concurrently and return the worst exit code."""
+    args = parse_arguments(argv)
+
+    deepseek = _load_script("test_deepseek_api", "test-deepseek-api.py")
+    qwen3 = _load_script("test_qwen3_api", "test-qwen3-api.py")
+    qwen3_235b = _load_script("test_qwen3_235b_api", "test-qwen3-235b-api.py")
+
+    deepseek_argv = ["--skip-rate-limits"] if args.skip_rate_limits else []
+    qwen3_235b_argv = []
+    if os.environ.get("DASHSCOPE_API_KEY"):
+        qwen3_235b_argv = ["--api-key", os.environ["DASHSCOPE_API_KEY"]]
+
+    runs = [
+        ("DeepSeek", deepseek.main_async, deepseek_argv, deepseek.DEFAULT_API_BASE),
+        ("Qwen3", qwen3.main_async, [], qwen3.DEFAULT_API_BASE),
+        ("Qwen3-235B", qwen3_235b.main_async, qwen3_235b_argv, qwen3_235b.DEFAULT_API_BASE)
+    ]
+
+    host_limits = {}
+    for _, _, _, api_base in runs:
+        host = urlparse(api_base).hostname
+        host_limits.setdefault(host, asyncio.Semaphore(args.per_host_limit))
+
+    results = await asyncio.gather(*(
+        _run_script(name, main, script_argv, host_limits[urlparse(api_base).hostname])
+        for name, main, script_argv, api_base in runs
+    ))
+
+    logger.info("\n" + "=" * 50)
+    logger.info("Suite Summary")
+    logger.info("=" * 50)
+
+    for name, code in results:
+        status = "✅ PASSED" if code == 0 else "❌ FAILED"
+        logger.info("%s - %s (exit code %s)", status, name, code)
+
+    return max(code for _, code in results)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Main function to run the suite."""
+    return asyncio.run(main_async(argv))
+
+if __name__ == "__main__":
+    sys.exit(main())
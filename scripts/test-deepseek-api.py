@@ -9,18 +9,50 @@ configured for use with your RAG and Agent setup.
 import os
 import sys
 import time
+import re
+import gzip
 import json
+import random
+import asyncio
 import argparse
+import functools
+import importlib.util
 import requests
-from typing import Dict, Any, Optional, List
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from types import MappingProxyType
+from typing import Dict, Any, Optional, List, Mapping, Sequence, Tuple
 import logging
 
+try:
+    import aiohttp
+except ImportError:  # Fall back to worker threads over the requests session
+    aiohttp = None
+
+try:
+    import aiodns  # noqa: F401 - required for aiohttp.AsyncResolver
+except ImportError:  # Fall back to aiohttp's default threaded resolver
+    aiodns = None
+
+try:
+    import httpx
+    import h2  # noqa: F401 - required for httpx's HTTP/2 support
+except ImportError:  # HTTP/2 is optional
+    httpx = None
+
+try:
+    import orjson
+except ImportError:  # Fall back to the stdlib encoder
+    orjson = None
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger("deepseek-api-test")
+# httpx logs every request at INFO; keep the test output readable
+logging.getLogger("httpx").setLevel(logging.WARNING)
 
 # Default API settings
 DEFAULT_API_BASE = "https://api.deepseek.com"
@@ -28,6 +60,147 @@ DEFAULT_API_VERSION = "v1"
 DEFAULT_MODEL = "deepseek-chat"
 DEFAULT_MAX_TOKENS = 1000
 DEFAULT_TEMPERATURE = 0.7
+DEFAULT_CONCURRENCY = 4
+PREVIEW_CHARS = 200
+DOMAIN_SCAN_CHARS = 300
+DEFAULT_POOL_CONNECTIONS = 16
+DEFAULT_POOL_MAXSIZE = 32
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# Test prompts are built once as immutable messages and reused on every call
+SYSTEM_MSG = MappingProxyType({"role": "system", "content": "You are DeepSeek, a helpful AI assistant."})
+DOMAIN_SYSTEM_MSG = MappingProxyType({
+    "role": "system",
+    "content": "You are DeepSeek, a helpful AI assistant specializing in quantitative investment."
+})
+MESSAGES_COMPLETION = (
+    SYSTEM_MSG,
+    MappingProxyType({
+        "role": "user",
+        "content": "What are the applications of quantitative investment in cryptocurrency markets?"
+    })
+)
+MESSAGES_DOMAIN = (
+    DOMAIN_SYSTEM_MSG,
+    MappingProxyType({
+        "role": "user",
+        "content": "Explain how to calculate the Sharpe ratio for a cryptocurrency portfolio and why it's important."
+    })
+)
+MESSAGES_PING = (
+    SYSTEM_MSG,
+    MappingProxyType({"role": "user", "content": "Hello, how are you today?"})
+)
+
+AUTH_FAILURE_CODES = (401, 403)
+RATE_LIMIT_RETRIES = 3
+BACKOFF_BASE = 0.5
+BACKOFF_JITTER = 0.3
+GZIP_MIN_BYTES = 4096
+DNS_CACHE_TTL = 300
+
+# urllib3, aiohttp and httpx only decode Brotli when a brotli package is installed
+if importlib.util.find_spec("brotli") or importlib.util.find_spec("brotlicffi"):
+    ACCEPT_ENCODING = "br, gzip, deflate"
+else:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+# Terminology expected in a good answer to the domain-specific prompt. The
+# lookahead lets overlapping terms ("return" inside "excess return") match in
+# a single pass over the response.
+DOMAIN_TERMS = ("risk-adjusted", "return", "volatility", "standard deviation", "excess return")
+_DOMAIN_RE = re.compile(
+    "(?=(" + "|".join(re.escape(term) for term in DOMAIN_TERMS) + "))",
+    re.IGNORECASE
+)
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize an object to JSON bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode("utf-8")
+
+def _dumps_pretty(obj: Any) -> str:
+    """Serialize an object to indented JSON text for logging."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode("utf-8")
+    return json.dumps(obj, indent=2)
+
+def _loads(data: bytes) -> Any:
+    """Parse a JSON response body, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+class UnexpectedResponseError(ValueError):
+    """Raised when the API answers with a body that lacks the expected fields."""
+    
+    def __init__(self, message: str, response: Any):
+        super().__init__(message)
+        self.response = response
+
+def _trunc(text: str, n: int = PREVIEW_CHARS) -> str:
+    """Shorten text to n characters, marking the cut with an ellipsis."""
+    return text if len(text) <= n else text[:n] + "..."
+
+def _error_status(error: BaseException) -> Optional[int]:
+    """Return the HTTP status carried by a requests, aiohttp or httpx error, if any."""
+    status = getattr(error, "status", None)  # aiohttp.ClientResponseError
+    if isinstance(status, int):
+        return status
+    response = getattr(error, "response", None)  # requests and httpx errors
+    return getattr(response, "status_code", None) if response is not None else None
+
+def messages_key(messages: Sequence[Mapping[str, Any]]) -> tuple:
+    """
+    Convert messages into a hashable key for completion_body().
+    
+    Every field of every message is kept, so extra fields such as 'name' or
+    'tool_call_id' survive the round trip. Accepts plain dicts as well as the
+    read-only MESSAGES_* constants.
+    """
+    return tuple(tuple(sorted(m.items())) for m in messages)
+
+def _completion_request(
+    model: str,
+    messages: List[Dict[str, Any]],
+    temperature: float,
+    max_tokens: int,
+    stream: bool
+) -> Dict[str, Any]:
+    """Build the JSON payload of a chat completion request."""
+    return {
+        "model": model,
+        "messages": messages,
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+        "stream": stream
+    }
+
+@functools.lru_cache(maxsize=32)
+def completion_body(
+    model: str,
+    messages: tuple,
+    temperature: float = DEFAULT_TEMPERATURE,
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+    stream: bool = False
+) -> bytes:
+    """
+    Serialize a chat completion request, reusing the bytes for identical requests.
+    
+    Args:
+        model: Model to use for completion.
+        messages: Messages as returned by messages_key().
+        temperature: Sampling temperature.
+        max_tokens: Maximum number of tokens to generate.
+        stream: Whether to stream the response.
+        
+    Returns:
+        JSON request body.
+    """
+    return _dumps(_completion_request(
+        model, [dict(items) for items in messages], temperature, max_tokens, stream
+    ))
 
 class DeepSeekAPI:
     """Client for interacting with the DeepSeek API."""
@@ -36,7 +209,8 @@ class DeepSeekAPI:
         self, 
         api_key: Optional[str] = None, 
         api_base: str = DEFAULT_API_BASE,
-        api_version: str = DEFAULT_API_VERSION
+        api_version: str = DEFAULT_API_VERSION,
+        compress_requests: bool = False
     ):
         """
         Initialize the DeepSeek API client.
@@ -45,6 +219,7 @@ class DeepSeekAPI:
             api_key: DeepSeek API key. If None, will look for DEEPSEEK_API_KEY environment variable.
             api_base: Base URL for the DeepSeek API.
             api_version: API version to use.
+            compress_requests: Gzip request bodies of GZIP_MIN_BYTES or more.
         """
         self.api_key = api_key or os.environ.get("DEEPSEEK_API_KEY")
         if not self.api_key:
@@ -52,56 +227,185 @@ class DeepSeekAPI:
         
         self.api_base = api_base
         self.api_version = api_version
-        self.session = requests.Session()
+        self.completions_url = f"{api_base}/{api_version}/chat/completions"
+        self.models_url = f"{api_base}/{api_version}/models"
+        self.compress_requests = compress_requests
+        self._model_ids: Optional[tuple] = None
         
         # Set up base headers
         self.headers = {
             "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
+            "Content-Type": "application/json",
+            "Accept-Encoding": ACCEPT_ENCODING
         }
+        
+        # Keep warm connections around and retry transient 429/5xx responses
+        retry_options = dict(
+            total=RATE_LIMIT_RETRIES,
+            backoff_factor=BACKOFF_BASE,
+            status_forcelist=RETRY_STATUS_CODES,
+            allowed_methods=frozenset(["GET", "POST"]),
+            respect_retry_after_header=True
+        )
+        try:
+            retry = Retry(backoff_jitter=BACKOFF_JITTER, **retry_options)
+        except TypeError:  # backoff_jitter needs urllib3 >= 2.0
+            retry = Retry(**retry_options)
+        adapter = HTTPAdapter(
+            pool_connections=DEFAULT_POOL_CONNECTIONS,
+            pool_maxsize=DEFAULT_POOL_MAXSIZE,
+            max_retries=retry
+        )
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(self.headers)
     
     def get_completion(
         self, 
-        messages: List[Dict[str, str]], 
+        messages: Optional[Sequence[Mapping[str, Any]]], 
         model: str = DEFAULT_MODEL,
         temperature: float = DEFAULT_TEMPERATURE,
         max_tokens: int = DEFAULT_MAX_TOKENS,
-        stream: bool = False
+        stream: bool = False,
+        precomputed_body: Optional[bytes] = None,
+        stream_text: bool = False,
+        max_chars: Optional[int] = None
     ) -> Dict[str, Any]:
         """
         Get a completion from the DeepSeek API.
         
         Args:
-            messages: List of message dictionaries with 'role' and 'content' keys.
+            messages: Sequence of message mappings with 'role' and 'content' keys.
             model: Model to use for completion.
             temperature: Sampling temperature.
             max_tokens: Maximum number of tokens to generate.
             stream: Whether to stream the response.
+            precomputed_body: Already serialized JSON request body, e.g. from
+                completion_body(). When given, it is sent as-is and the other request
+                arguments are ignored; with stream_text it must enable streaming.
+            stream_text: Stream the completion and assemble the text from the
+                server-sent events instead of waiting for the full body.
+            max_chars: With stream_text, stop reading once this many characters
+                have been received.
             
         Returns:
-            API response as a dictionary.
+            API response as a dictionary. Streamed completions are returned in the
+            same shape as a regular response, with the assembled text as the message.
         """
-        url = f"{self.api_base}/{self.api_version}/chat/completions"
-        
-        payload = {
-            "model": model,
-            "messages": messages,
-            "temperature": temperature,
-            "max_tokens": max_tokens,
-            "stream": stream
-        }
+        if precomputed_body is None:
+            try:
+                precomputed_body = completion_body(
+                    model, messages_key(messages), temperature, max_tokens, stream or stream_text
+                )
+            except TypeError:  # Unhashable field values (e.g. tool_calls lists) can't be cached
+                precomputed_body = _dumps(_completion_request(
+                    model, [dict(m) for m in messages], temperature, max_tokens, stream or stream_text
+                ))
         
         try:
-            response = self.session.post(url, headers=self.headers, json=payload, timeout=60)
+            if stream_text:
+                return self._stream_completion(precomputed_body, max_chars)
+            response = self._post_completion(precomputed_body)
             response.raise_for_status()
-            return response.json()
+            return _loads(response.content)
         except requests.exceptions.RequestException as e:
-            logger.error(f"API request failed: {e}")
-            if hasattr(e, 'response') and e.response:
-                logger.error(f"Response status: {e.response.status_code}")
-                logger.error(f"Response body: {e.response.text}")
+            logger.error("API request failed: %s", e)
+            if getattr(e, 'response', None) is not None:
+                logger.error("Response status: %s", e.response.status_code)
+                logger.error("Response body: %s", e.response.text)
             raise
     
+    def encode_body(self, body: bytes) -> Tuple[bytes, Dict[str, str]]:
+        """
+        Prepare a serialized request body for sending, on any transport.
+        
+        Args:
+            body: Serialized JSON request body.
+            
+        Returns:
+            Tuple of (body, extra headers). The body is gzipped and a
+            Content-Encoding header added when compress_requests is enabled
+            and the body is at least GZIP_MIN_BYTES long.
+        """
+        if self.compress_requests and len(body) >= GZIP_MIN_BYTES:
+            return gzip.compress(body), {"Content-Encoding": "gzip"}
+        return body, {}
+    
+    def _post_completion(self, body: bytes, **kwargs) -> requests.Response:
+        """
+        POST a serialized body to the completions endpoint.
+        
+        Large bodies are gzipped when compress_requests is enabled.
+        """
+        body, headers = self.encode_body(body)
+        return self.session.post(self.completions_url, data=body, headers=headers, timeout=60, **kwargs)
+    
+    def _stream_completion(self, body: bytes, max_chars: Optional[int]) -> Dict[str, Any]:
+        """
+        Read a streamed completion, stopping early once max_chars have arrived.
+        
+        A stream read to the end returns its connection to the pool. Stopping
+        early leaves unread data on the socket, so urllib3 closes that
+        connection instead and the next request opens a new one; that trade is
+        worth it when the rest of the completion would otherwise be waited for.
+        
+        Args:
+            body: Serialized chat completion request with streaming enabled.
+            max_chars: Number of characters after which to stop reading, or None.
+            
+        Returns:
+            API response as a dictionary containing the assembled message. If the
+            stream carried an error object, or no completion chunks at all (e.g. a
+            plain JSON error body), that object is returned as-is instead.
+        """
+        parts = []
+        received = 0
+        got_choices = False
+        done = False
+        unparsed = []
+        
+        with self._post_completion(body, stream=True) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                # Keep reading after [DONE] so the chunked terminator is consumed
+                # and the connection can be reused
+                if done:
+                    continue
+                if not line.startswith(b"data:"):
+                    if not got_choices:
+                        unparsed.append(line)
+                    continue
+                data = line[len(b"data:"):].strip()
+                if data == b"[DONE]":
+                    done = True
+                    continue
+                
+                chunk = _loads(data)
+                if "error" in chunk:
+                    return chunk
+                for choice in chunk.get("choices", []):
+                    got_choices = True
+                    text = choice.get("delta", {}).get("content") or ""
+                    parts.append(text)
+                    received += len(text)
+                
+                if max_chars is not None and received >= max_chars:
+                    break  # Discards the connection; see the docstring
+        
+        if not got_choices:
+            # Not a completion stream; let the caller's format check see the body
+            try:
+                return _loads(b"\n".join(unparsed))
+            except ValueError:
+                return {}
+        
+        return {
+            "choices": [
+                {"index": 0, "message": {"role": "assistant", "content": "".join(parts)}}
+            ]
+        }
+    
     def get_models(self) -> Dict[str, Any]:
         """
         Get available models from the DeepSeek API.
@@ -109,20 +413,37 @@ class DeepSeekAPI:
         Returns:
             List of available models.
         """
-        url = f"{self.api_base}/{self.api_version}/models"
-        
         try:
-            response = self.session.get(url, headers=self.headers, timeout=30)
+            response = self.session.get(self.models_url, timeout=30)
             response.raise_for_status()
-            return response.json()
+            return _loads(response.content)
         except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to get models: {e}")
-            if hasattr(e, 'response') and e.response:
-                logger.error(f"Response status: {e.response.status_code}")
-                logger.error(f"Response body: {e.response.text}")
+            logger.error("Failed to get models: %s", e)
+            if getattr(e, 'response', None) is not None:
+                logger.error("Response status: %s", e.response.status_code)
+                logger.error("Response body: %s", e.response.text)
             raise
+    
+    def get_models_cached(self) -> tuple:
+        """
+        Get the IDs of the available models, fetching them only once per client.
+        
+        Returns:
+            Tuple of model IDs.
+            
+        Raises:
+            UnexpectedResponseError: If the API returned an unexpected format.
+        """
+        if self._model_ids is not None:
+            return self._model_ids
+        
+        models = self.get_models()
+        if "data" not in models or not isinstance(models["data"], list):
+            raise UnexpectedResponseError("API returned unexpected format", models)
+        self._model_ids = tuple(m.get('id', 'unknown') for m in models['data'])
+        return self._model_ids
 
-def test_api_connectivity(api_client: DeepSeekAPI) -> bool:
+def test_api_connectivity(api_client: DeepSeekAPI) -> Tuple[bool, bool]:
     """
     Test basic connectivity to the DeepSeek API.
     
@@ -130,25 +451,25 @@ def test_api_connectivity(api_client: DeepSeekAPI) -> bool:
         api_client: Initialized DeepSeekAPI client.
         
     Returns:
-        True if successful, False otherwise.
+        Tuple of (ok, fatal). fatal is True when the API rejected the key
+        (401/403), in which case the remaining tests cannot succeed either.
     """
     try:
         logger.info("Testing API connectivity...")
-        start_time = time.time()
-        models = api_client.get_models()
-        elapsed = time.time() - start_time
+        start_time = time.perf_counter()
+        model_ids = api_client.get_models_cached()
+        elapsed = time.perf_counter() - start_time
         
-        if "data" in models and isinstance(models["data"], list):
-            logger.info(f"✅ API connection successful ({elapsed:.2f}s)")
-            logger.info(f"Available models: {', '.join([m.get('id', 'unknown') for m in models['data']])}")
-            return True
-        else:
-            logger.error("❌ API returned unexpected format")
-            logger.error(f"Response: {json.dumps(models, indent=2)}")
-            return False
+        logger.info("✅ API connection successful (%.2fs)", elapsed)
+        logger.info("Available models: %s", ', '.join(model_ids))
+        return True, False
+    except UnexpectedResponseError as e:
+        logger.error("❌ API connectivity test failed: %s", e)
+        logger.error("Response: %s", _dumps_pretty(e.response))
+        return False, False
     except Exception as e:
-        logger.error(f"❌ API connectivity test failed: {e}")
-        return False
+        logger.error("❌ API connectivity test failed: %s", e)
+        return False, _error_status(e) in AUTH_FAILURE_CODES
 
 def test_completion(api_client: DeepSeekAPI, model: str) -> bool:
     """
@@ -162,32 +483,33 @@ def test_completion(api_client: DeepSeekAPI, model: str) -> bool:
         True if successful, False otherwise.
     """
     try:
-        logger.info(f"Testing completion with model '{model}'...")
+        logger.info("Testing completion with model '%s'...", model)
         
-        # Simple test message
-        messages = [
-            {"role": "system", "content": "You are DeepSeek, a helpful AI assistant."},
-            {"role": "user", "content": "What are the applications of quantitative investment in cryptocurrency markets?"}
-        ]
-        
-        start_time = time.time()
-        response = api_client.get_completion(messages, model=model, max_tokens=200)
-        elapsed = time.time() - start_time
+        start_time = time.perf_counter()
+        response = api_client.get_completion(
+            MESSAGES_COMPLETION, model=model, max_tokens=200, stream_text=True, max_chars=PREVIEW_CHARS
+        )
+        elapsed = time.perf_counter() - start_time
         
         if "choices" in response and len(response["choices"]) > 0:
             content = response["choices"][0].get("message", {}).get("content", "")
-            logger.info(f"✅ Completion test successful ({elapsed:.2f}s)")
-            logger.info("Sample response:")
-            logger.info("-" * 40)
-            logger.info(content[:200] + ("..." if len(content) > 200 else ""))
-            logger.info("-" * 40)
+            if not content:
+                logger.error("❌ Completion test failed: empty response")
+                return False
+            logger.info("✅ Completion test successful (%.2fs)", elapsed)
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Sample response:")
+                logger.info("-" * 40)
+                logger.info("%s", _trunc(content))
+                logger.info("-" * 40)
             return True
         else:
             logger.error("❌ Completion test failed: unexpected response format")
-            logger.error(f"Response: {json.dumps(response, indent=2)}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Response: %s", _dumps_pretty(response))
             return False
     except Exception as e:
-        logger.error(f"❌ Completion test failed: {e}")
+        logger.error("❌ Completion test failed: %s", e)
         return False
 
 def test_domain_specific(api_client: DeepSeekAPI, model: str) -> bool:
@@ -204,100 +526,274 @@ def test_domain_specific(api_client: DeepSeekAPI, model: str) -> bool:
     try:
         logger.info("Testing domain-specific knowledge...")
         
-        # Domain-specific test message
-        messages = [
-            {"role": "system", "content": "You are DeepSeek, a helpful AI assistant specializing in quantitative investment."},
-            {"role": "user", "content": "Explain how to calculate the Sharpe ratio for a cryptocurrency portfolio and why it's important."}
-        ]
-        
-        start_time = time.time()
-        response = api_client.get_completion(messages, model=model, max_tokens=300)
-        elapsed = time.time() - start_time
+        start_time = time.perf_counter()
+        response = api_client.get_completion(
+            MESSAGES_DOMAIN, model=model, max_tokens=300, stream_text=True, max_chars=DOMAIN_SCAN_CHARS
+        )
+        elapsed = time.perf_counter() - start_time
         
         if "choices" in response and len(response["choices"]) > 0:
             content = response["choices"][0].get("message", {}).get("content", "")
+            if not content:
+                logger.error("❌ Domain knowledge test failed: empty response")
+                return False
             
             # Check for domain terminology
-            domain_terms = ["risk-adjusted", "return", "volatility", "standard deviation", "excess return"]
-            
-            matched_terms = [term for term in domain_terms if term.lower() in content.lower()]
+            found = {m.group(1).lower() for m in _DOMAIN_RE.finditer(content)}
+            matched_terms = [term for term in DOMAIN_TERMS if term in found]
             
             if matched_terms:
-                logger.info(f"✅ Domain knowledge test successful ({elapsed:.2f}s)")
-                logger.info(f"Matched domain terms: {', '.join(matched_terms)}")
+                logger.info("✅ Domain knowledge test successful (%.2fs)", elapsed)
+                logger.info("Matched domain terms: %s", ', '.join(matched_terms))
                 return True
             else:
                 logger.warning("⚠️ Domain knowledge test partial: response doesn't contain expected terminology")
-                logger.info("Sample response:")
-                logger.info("-" * 40)
-                logger.info(content[:200] + ("..." if len(content) > 200 else ""))
-                logger.info("-" * 40)
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info("Sample response:")
+                    logger.info("-" * 40)
+                    logger.info("%s", _trunc(content))
+                    logger.info("-" * 40)
                 return True  # Still return True as the API worked
         else:
             logger.error("❌ Domain knowledge test failed: unexpected response format")
             return False
     except Exception as e:
-        logger.error(f"❌ Domain knowledge test failed: {e}")
+        logger.error("❌ Domain knowledge test failed: %s", e)
         return False
 
-def test_rate_limits(api_client: DeepSeekAPI, model: str) -> bool:
+def _make_connector() -> "aiohttp.TCPConnector":
+    """
+    Create the aiohttp connector with keep-alive and a DNS cache.
+    
+    Resolved addresses are cached for DNS_CACHE_TTL seconds. The non-blocking
+    aiodns resolver is used when installed, otherwise aiohttp's threaded one.
+    """
+    options = dict(limit=32, keepalive_timeout=60, ttl_dns_cache=DNS_CACHE_TTL)
+    if aiohttp is not None and aiodns is not None:
+        options["resolver"] = aiohttp.AsyncResolver()
+    return aiohttp.TCPConnector(**options)
+
+# One aiohttp session per process, so its keep-alive pool outlives single calls
+_AIOHTTP_SESSION: Optional["aiohttp.ClientSession"] = None
+_AIOHTTP_LOOP: Optional[asyncio.AbstractEventLoop] = None
+
+async def get_session() -> "aiohttp.ClientSession":
+    """
+    Return the shared aiohttp session, creating it on first use.
+    
+    A session is bound to the event loop it was created on, so a new one is
+    created when called from a different loop (e.g. a second asyncio.run()).
+    Headers are passed per request so clients with different keys can share it.
+    main_async() closes it when done; other callers should await close_session().
+    """
+    global _AIOHTTP_SESSION, _AIOHTTP_LOOP
+    loop = asyncio.get_running_loop()
+    if _AIOHTTP_SESSION is None or _AIOHTTP_SESSION.closed or _AIOHTTP_LOOP is not loop:
+        _AIOHTTP_SESSION = aiohttp.ClientSession(
+            connector=_make_connector(),
+            timeout=aiohttp.ClientTimeout(total=60)
+        )
+        _AIOHTTP_LOOP = loop
+    return _AIOHTTP_SESSION
+
+async def close_session() -> None:
+    """Close the shared aiohttp session, if one is open."""
+    global _AIOHTTP_SESSION, _AIOHTTP_LOOP
+    if _AIOHTTP_SESSION is not None and not _AIOHTTP_SESSION.closed:
+        await _AIOHTTP_SESSION.close()
+    _AIOHTTP_SESSION = None
+    _AIOHTTP_LOOP = None
+
+def _open_http2_client(api_client: DeepSeekAPI):
+    """
+    Create an HTTP/2 client so concurrent requests multiplex over one connection.
+    
+    Args:
+        api_client: Initialized DeepSeekAPI client whose headers are reused.
+        
+    Returns:
+        An httpx.AsyncClient, or None when httpx[http2] is not installed.
+    """
+    if httpx is None:
+        logger.warning("HTTP/2 requested but httpx[http2] is not installed; falling back to HTTP/1.1")
+        return None
+    return httpx.AsyncClient(
+        http2=True,
+        headers=api_client.headers,
+        timeout=60,
+        limits=httpx.Limits(max_connections=32, max_keepalive_connections=16)
+    )
+
+def _backoff_delay(attempt: int, retry_after: Optional[str] = None) -> float:
     """
-    Test API rate limits by making several requests in sequence.
+    Compute how long to wait before retrying a rate-limited request.
+    
+    Args:
+        attempt: Zero-based number of the attempt that was rejected.
+        retry_after: Value of the server's Retry-After header, if any.
+        
+    Returns:
+        Delay in seconds: exponential backoff with jitter, but never less than
+        what the server asked for.
+    """
+    delay = BACKOFF_BASE * 2 ** attempt + random.uniform(0, BACKOFF_JITTER)
+    if retry_after:
+        try:
+            delay = max(delay, float(retry_after))
+        except ValueError:
+            pass  # HTTP-date form; keep the computed backoff
+    return delay
+
+async def _completion_async(
+    session,
+    sem: asyncio.Semaphore,
+    api_client: DeepSeekAPI,
+    body: bytes,
+    auth_failed: Optional[asyncio.Event] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Send a single completion request, bounded by the given semaphore.
+    
+    Requests rejected with 429 are retried after _backoff_delay(), up to
+    RATE_LIMIT_RETRIES times. The threaded fallback gets the same behaviour
+    from the session's urllib3 Retry policy.
+    
+    Args:
+        session: An httpx.AsyncClient from _open_http2_client(), the shared aiohttp
+            session from get_session(), or None to run the blocking client in a
+            worker thread.
+        sem: Semaphore limiting the number of requests in flight.
+        api_client: Initialized DeepSeekAPI client.
+        body: Serialized chat completion request body.
+        auth_failed: Event set once any request is rejected with 401/403; requests
+            still waiting on the semaphore are then skipped.
+        
+    Returns:
+        API response as a dictionary, or None if the request was skipped.
+    """
+    async with sem:
+        if auth_failed is not None and auth_failed.is_set():
+            return None
+        try:
+            return await _send_completion(session, api_client, body)
+        except Exception as e:
+            if auth_failed is not None and _error_status(e) in AUTH_FAILURE_CODES:
+                auth_failed.set()
+            raise
+
+async def _send_completion(session, api_client: DeepSeekAPI, body: bytes) -> Dict[str, Any]:
+    """Send the request for _completion_async(), retrying on 429."""
+    if session is None:
+        return await asyncio.to_thread(api_client.get_completion, None, precomputed_body=body)
+    
+    body, extra_headers = api_client.encode_body(body)
+    headers = {**api_client.headers, **extra_headers}
+    
+    for attempt in range(RATE_LIMIT_RETRIES + 1):
+        last_attempt = attempt == RATE_LIMIT_RETRIES
+        
+        if httpx is not None and isinstance(session, httpx.AsyncClient):
+            response = await session.post(api_client.completions_url, content=body, headers=extra_headers)
+            if response.status_code != 429 or last_attempt:
+                response.raise_for_status()
+                return _loads(response.content)
+            retry_after = response.headers.get("Retry-After")
+        else:
+            async with session.post(api_client.completions_url, data=body, headers=headers) as response:
+                if response.status != 429 or last_attempt:
+                    response.raise_for_status()
+                    return _loads(await response.read())
+                retry_after = response.headers.get("Retry-After")
+        
+        delay = _backoff_delay(attempt, retry_after)
+        logger.warning("⚠️ Rate limited, retrying in %.2fs", delay)
+        await asyncio.sleep(delay)
+
+async def test_rate_limits(
+    api_client: DeepSeekAPI,
+    model: str,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    http2: bool = False
+) -> bool:
+    """
+    Test API rate limits by making several requests concurrently.
     
     Args:
         api_client: Initialized DeepSeekAPI client.
         model: Model to test with.
+        concurrency: Maximum number of requests in flight at once.
+        http2: Multiplex the requests over a single HTTP/2 connection if possible.
         
     Returns:
         True if successful, False otherwise.
     """
     try:
-        logger.info("Testing API rate limits with sequential requests...")
+        # Make 3 requests at once; the semaphore shapes the request rate
+        num_requests = 3
+        logger.info(
+            "Testing API rate limits with %s requests (at most %s in flight)...", num_requests, concurrency
+        )
         
-        # Simple query to use for testing
-        messages = [
-            {"role": "system", "content": "You are DeepSeek, a helpful AI assistant."},
-            {"role": "user", "content": "Hello, how are you today?"}
-        ]
+        # Every request is identical, so the body is serialized only once
+        body = completion_body(model, messages_key(MESSAGES_PING), DEFAULT_TEMPERATURE, 50)
         
-        # Make 3 requests in quick succession
-        num_requests = 3
         successful = 0
+        sem = asyncio.Semaphore(concurrency)
+        auth_failed = asyncio.Event()
         
-        for i in range(1, num_requests + 1):
-            logger.info(f"Making request {i}/{num_requests}...")
-            try:
-                start_time = time.time()
-                response = api_client.get_completion(messages, model=model, max_tokens=50)
-                elapsed = time.time() - start_time
-                
-                if "choices" in response and len(response["choices"]) > 0:
-                    logger.info(f"✅ Request {i} successful ({elapsed:.2f}s)")
-                    successful += 1
-                else:
-                    logger.warning(f"⚠️ Request {i} returned unexpected format")
-                
-                # Small delay to avoid hitting rate limits too hard
-                time.sleep(1)
-            except Exception as e:
-                logger.error(f"❌ Request {i} failed: {e}")
+        async def timed(i: int, session):
+            logger.info("Making request %s/%s...", i, num_requests)
+            start_time = time.perf_counter()
+            response = await _completion_async(session, sem, api_client, body, auth_failed)
+            return response, time.perf_counter() - start_time
+        
+        async def send_all(session):
+            tasks = [timed(i, session) for i in range(1, num_requests + 1)]
+            return await asyncio.gather(*tasks, return_exceptions=True)
+        
+        client = _open_http2_client(api_client) if http2 else None
+        if client is not None:
+            async with client:
+                results = await send_all(client)
+        elif aiohttp is not None:
+            results = await send_all(await get_session())
+        else:
+            results = await send_all(None)
+        
+        for i, result in enumerate(results, start=1):
+            if isinstance(result, Exception):
+                logger.error("❌ Request %s failed: %s", i, result)
+                continue
+            
+            response, elapsed = result
+            if response is None:
+                logger.warning("⚠️ Request %s skipped after an authentication failure", i)
+            elif "choices" in response and len(response["choices"]) > 0:
+                logger.info("✅ Request %s successful (%.2fs)", i, elapsed)
+                successful += 1
+            else:
+                logger.warning("⚠️ Request %s returned unexpected format", i)
+        
+        if auth_failed.is_set():
+            logger.error("❌ Rate limit test failed: the API rejected the key")
+            return False
         
         rate_limit_percentage = (successful / num_requests) * 100
         if rate_limit_percentage == 100:
             logger.info("✅ Rate limit test passed: All requests were successful")
             return True
         elif rate_limit_percentage >= 50:
-            logger.warning(f"⚠️ Rate limit test partially successful: {rate_limit_percentage:.1f}% of requests succeeded")
+            logger.warning("⚠️ Rate limit test partially successful: %.1f%% of requests succeeded", rate_limit_percentage)
             return True  # Still return True as some requests worked
         else:
-            logger.error(f"❌ Rate limit test failed: Only {rate_limit_percentage:.1f}% of requests succeeded")
+            logger.error("❌ Rate limit test failed: Only %.1f%% of requests succeeded", rate_limit_percentage)
             return False
     except Exception as e:
-        logger.error(f"❌ Rate limit test failed with unexpected error: {e}")
+        logger.error("❌ Rate limit test failed with unexpected error: %s", e)
         return False
 
-def parse_arguments():
-    """Parse command line arguments."""
+def parse_arguments(argv: Optional[List[str]] = None):
+    """Parse command line arguments (from sys.argv when argv is None)."""
     parser = argparse.ArgumentParser(description="Test DeepSeek API connectivity and functionality")
     
     parser.add_argument(
@@ -322,58 +818,112 @@ def parse_arguments():
         action="store_true",
         help="Skip rate limit tests"
     )
+    parser.add_argument(
+        "--compress-requests", 
+        action="store_true",
+        help="Gzip large request bodies (the server must accept Content-Encoding: gzip)"
+    )
+    parser.add_argument(
+        "--http2", 
+        action="store_true",
+        help="Multiplex the concurrent rate limit requests over HTTP/2 (requires httpx[http2])"
+    )
     parser.add_argument(
         "--verbose", 
         action="store_true",
         help="Enable verbose logging"
     )
+    parser.add_argument(
+        "--quiet", 
+        action="store_true",
+        help="Only log warnings and errors"
+    )
     
-    return parser.parse_args()
+    return parser.parse_args(argv)
 
-def main():
-    """Main function to run the tests."""
-    args = parse_arguments()
+async def _run_test(name: str, test_func, sem: asyncio.Semaphore):
+    """
+    Run a single test under the shared semaphore and time it.
+    
+    Blocking tests are moved to a worker thread so they overlap with each other.
+    
+    Returns:
+        Tuple of (name, success, elapsed seconds).
+    """
+    async with sem:
+        logger.info("Running test: %s", name)
+        start_time = time.perf_counter()
+        
+        if asyncio.iscoroutinefunction(test_func):
+            success = await test_func()
+        else:
+            success = await asyncio.to_thread(test_func)
+        
+        return name, success, time.perf_counter() - start_time
+
+async def _run_all(tests) -> list:
+    """Run all tests concurrently and return their results in the original order."""
+    sem = asyncio.Semaphore(DEFAULT_CONCURRENCY)
+    outcomes = await asyncio.gather(
+        *(_run_test(name, test_func, sem) for name, test_func in tests),
+        return_exceptions=True
+    )
+    
+    results = []
+    for (name, _), outcome in zip(tests, outcomes):
+        if isinstance(outcome, Exception):
+            logger.error("❌ %s test raised an unexpected error: %s", name, outcome)
+            results.append((name, False, 0.0))
+        else:
+            results.append(outcome)
+    return results
+
+async def main_async(argv: Optional[List[str]] = None) -> int:
+    """Run the tests on the current event loop and return the exit code."""
+    args = parse_arguments(argv)
     
     # Set logging level based on verbosity
     if args.verbose:
         logger.setLevel(logging.DEBUG)
+    elif args.quiet:
+        logger.setLevel(logging.WARNING)
     
     logger.info("Starting DeepSeek API tests...")
-    logger.info(f"API Base: {args.api_base}")
-    logger.info(f"Model: {args.model}")
+    logger.info("API Base: %s", args.api_base)
+    logger.info("Model: %s", args.model)
     
     try:
         # Initialize API client
         api_client = DeepSeekAPI(
             api_key=args.api_key,
-            api_base=args.api_base
+            api_base=args.api_base,
+            compress_requests=args.compress_requests
         )
         
-        # Run tests
+        # Check connectivity first: a rejected key makes every other test fail too
+        logger.info("Running test: %s", "API Connectivity")
+        start_time = time.perf_counter()
+        ok, fatal = await asyncio.to_thread(test_api_connectivity, api_client)
+        connectivity = ("API Connectivity", ok, time.perf_counter() - start_time)
+        
+        if fatal:
+            logger.error("\n❌ Authentication failed! Skipping the remaining tests; check your DeepSeek API key.")
+            return 2
+        
+        # The remaining tests are independent, so run them concurrently
         tests = [
-            ("API Connectivity", lambda: test_api_connectivity(api_client)),
-            ("Completion", lambda: test_completion(api_client, args.model)),
-            ("Domain Knowledge", lambda: test_domain_specific(api_client, args.model))
+            ("Completion", functools.partial(test_completion, api_client, args.model)),
+            ("Domain Knowledge", functools.partial(test_domain_specific, api_client, args.model))
         ]
         
         if not args.skip_rate_limits:
-            tests.append(("Rate Limits", lambda: test_rate_limits(api_client, args.model)))
-        
-        # Run each test and collect results
-        results = []
-        for name, test_func in tests:
-            logger.info("\n" + "=" * 50)
-            logger.info(f"Running test: {name}")
-            logger.info("=" * 50)
-            
-            start_time = time.time()
-            success = test_func()
-            elapsed = time.time() - start_time
-            
-            results.append((name, success, elapsed))
-            
-            # Small delay between tests
-            time.sleep(1)
+            tests.append(("Rate Limits", functools.partial(test_rate_limits, api_client, args.model, http2=args.http2)))
+        
+        logger.info("\n" + "=" * 50)
+        logger.info("Running %s tests concurrently", len(tests))
+        logger.info("=" * 50)
+        
+        results = [connectivity] + await _run_all(tests)
         
         # Print summary
         logger.info("\n" + "=" * 50)
@@ -382,7 +932,7 @@ def main():
         
         for name, success, elapsed in results:
             status = "✅ PASSED" if success else "❌ FAILED"
-            logger.info(f"{status} - {name} ({elapsed:.2f}s)")
+            logger.info("%s - %s (%.2fs)", status, name, elapsed)
         
         # Overall result
         success_count = sum(1 for _, success, _ in results if success)
@@ -390,15 +940,21 @@ def main():
             logger.info("\n✅ All tests passed! DeepSeek API is properly configured.")
             return 0
         elif success_count > 0:
-            logger.warning(f"\n⚠️ {success_count}/{len(results)} tests passed. Some DeepSeek API features are working.")
+            logger.warning("\n⚠️ %s/%s tests passed. Some DeepSeek API features are working.", success_count, len(results))
             return 1
         else:
             logger.error("\n❌ All tests failed! Please check your DeepSeek API configuration.")
             return 2
     
     except Exception as e:
-        logger.error(f"Tests failed with unexpected error: {e}")
+        logger.error("Tests failed with unexpected error: %s", e)
         return 3
+    finally:
+        await close_session()
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Main function to run the tests."""
+    return asyncio.run(main_async(argv))
 
 if __name__ == "__main__":
     sys.exit(main())
\ No newline at end of file
@@ -2,46 +2,115 @@
 # Test script for Qwen3-235B-A22B model
 
 import os
+import sys
+import asyncio
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import argparse
 import json
+import functools
+import importlib.util
 
-def test_qwen3_235b(api_key, api_base="https://dashscope.aliyuncs.com/api/v1"):
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json"
-    }
+try:
+    import orjson
+except ImportError:  # Fall back to the stdlib encoder
+    orjson = None
+
+# urllib3 only decodes Brotli when a brotli package is installed
+if importlib.util.find_spec("brotli") or importlib.util.find_spec("brotlicffi"):
+    ACCEPT_ENCODING = "br, gzip, deflate"
+else:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+def _dumps_pretty(obj):
+    """Serialize an object to indented JSON text, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode('utf-8')
+    return json.dumps(obj, indent=2)
+
+def _loads(data):
+    """Parse a JSON response body, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+DEFAULT_API_BASE = "https://dashscope.aliyuncs.com/api/v1"
+DEFAULT_MODEL = "qwen3-235b-a22b"
+DEFAULT_PROMPT = "Explain quantum computing in 50 words"
+
+class Qwen235BClient:
+    """Reusable DashScope client for the Qwen3-235B-A22B model."""
     
-    payload = {
-        "model": "qwen3-235b-a22b",
-        "input": {
-            "messages": [{
-                "role": "user",
-                "content": "Explain quantum computing in 50 words"
-            }]
-        },
-        "parameters": {
-            "temperature": 0.7,
-            "top_p": 0.9,
-            "max_tokens": 500
-        }
-    }
+    def __init__(self, api_key, api_base=DEFAULT_API_BASE, model=DEFAULT_MODEL):
+        self.model = model
+        self.url = f"{api_base.rstrip('/')}/services/aigc/text-generation/generation"
+        
+        # Keep-alive pool plus retries, so repeated calls skip the TLS handshake
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+            "Accept-Encoding": ACCEPT_ENCODING
+        })
+        retry = Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(["POST"])
+        )
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=16, max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
     
+    def generate(self, prompt):
+        """Send a single prompt and return the parsed response."""
+        payload = {
+            "model": self.model,
+            "input": {
+                "messages": [{
+                    "role": "user",
+                    "content": prompt
+                }]
+            },
+            "parameters": {
+                "temperature": 0.7,
+                "top_p": 0.9,
+                "max_tokens": 500
+            }
+        }
+        
+        # (connect, read) timeouts so a stalled server cannot hang the caller
+        response = self.session.post(self.url, json=payload, timeout=(5, 60))
+        return _loads(response.content)
+
+@functools.lru_cache(maxsize=8)
+def _get_client(api_key, api_base):
+    """Return a shared client per key and base URL."""
+    return Qwen235BClient(api_key, api_base)
+
+def test_qwen3_235b(api_key, api_base=DEFAULT_API_BASE):
     try:
-        response = requests.post(
-            f"{api_base}/services/aigc/text-generation/generation",
-            headers=headers,
-            json=payload
-        )
-        return response.json()
+        return _get_client(api_key, api_base or DEFAULT_API_BASE).generate(DEFAULT_PROMPT)
     except Exception as e:
         return {"error": str(e)}
 
-if __name__ == "__main__":
+def parse_args(argv=None):
     parser = argparse.ArgumentParser()
     parser.add_argument("--api-key", required=True)
     parser.add_argument("--api-base")
-    args = parser.parse_args()
+    return parser.parse_args(argv)
+
+async def main_async(argv=None):
+    """Run the 235B test on the current event loop and return the exit code."""
+    args = parse_args(argv)
     
-    result = test_qwen3_235b(args.api_key, args.api_base)
-    print(json.dumps(result, indent=2)) 
\ No newline at end of file
+    result = await asyncio.to_thread(test_qwen3_235b, args.api_key, args.api_base)
+    print(_dumps_pretty(result))
+    return 0 if "output" in result else 1
+
+def main(argv=None):
+    return asyncio.run(main_async(argv))
+
+if __name__ == "__main__":
+    sys.exit(main())
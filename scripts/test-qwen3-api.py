@@ -4,10 +4,25 @@
 import os
 import sys
 import json
+import asyncio
+import functools
+import importlib.util
+import time
 import argparse
 import requests
+from requests.adapters import HTTPAdapter
 from datetime import datetime
 
+try:
+    import aiohttp
+except ImportError:  # Fall back to worker threads over the requests session
+    aiohttp = None
+
+try:
+    import orjson
+except ImportError:  # Fall back to the stdlib encoder
+    orjson = None
+
 # ANSI colors
 BLUE = '\033[94m'
 GREEN = '\033[92m'
@@ -15,15 +30,66 @@ YELLOW = '\033[93m'
 RED = '\033[91m'
 ENDC = '\033[0m'
 
-def parse_args():
+DEFAULT_API_BASE = 'https://dashscope.aliyuncs.com/v1'
+DEFAULT_MODEL = 'qwen3-72b-chat'
+DEFAULT_BATCH_PROMPTS = (
+    "Say hello in 5 words or less.",
+    "Name one use of quantitative investment in 5 words or less.",
+    "Define volatility in 5 words or less."
+)
+
+# urllib3 only decodes Brotli when a brotli package is installed
+if importlib.util.find_spec("brotli") or importlib.util.find_spec("brotlicffi"):
+    ACCEPT_ENCODING = "br, gzip, deflate"
+else:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+def _auth_headers(api_key):
+    """Headers every DashScope request needs, shared by the requests and aiohttp sessions."""
+    return {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json",
+        "Accept-Encoding": ACCEPT_ENCODING
+    }
+
+@functools.lru_cache(maxsize=8)
+def _get_session(api_key):
+    """
+    Return a keep-alive session for this key, so repeated calls reuse the TCP/TLS connection.
+    
+    The headers are set once when the session is built and never modified afterwards,
+    so the session can be shared safely between threads.
+    """
+    session = requests.Session()
+    session.headers.update(_auth_headers(api_key))
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def _dumps_pretty(obj):
+    """Serialize an object to indented JSON text, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode('utf-8')
+    return json.dumps(obj, indent=2)
+
+def _loads(data):
+    """Parse a JSON response body, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def parse_args(argv=None):
     parser = argparse.ArgumentParser(description='Test DashScope API connection for Qwen3')
     parser.add_argument('--api-key', type=str, help='DashScope API key (default: from environment)')
-    parser.add_argument('--api-base', type=str, default='https://dashscope.aliyuncs.com/v1', 
+    parser.add_argument('--api-base', type=str, default=DEFAULT_API_BASE, 
                         help='DashScope API base URL')
-    parser.add_argument('--model', type=str, default='qwen3-72b-chat', 
+    parser.add_argument('--model', type=str, default=DEFAULT_MODEL, 
                         help='Qwen3 model to use for testing')
+    parser.add_argument('--batch', action='store_true',
+                        help='Also send several prompts concurrently and compare with sending them one by one')
     parser.add_argument('--verbose', action='store_true', help='Display detailed information')
-    return parser.parse_args()
+    return parser.parse_args(argv)
 
 def print_status(message, status='info'):
     """Print a status message with appropriate color."""
@@ -38,20 +104,13 @@ def print_status(message, status='info'):
     else:
         print(message)
 
-def test_api_connection(api_key, api_base, model, verbose=False):
-    """Test the DashScope API connection with a simple query."""
-    print_status(f"Testing DashScope API connection with model: {model}", 'info')
-    
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json"
-    }
-    
-    data = {
+def _request_data(model, prompt):
+    """Build the request body for a single prompt."""
+    return {
         "model": model,
         "input": {
             "messages": [
-                {"role": "user", "content": "Say hello in 5 words or less."}
+                {"role": "user", "content": prompt}
             ]
         },
         "parameters": {
@@ -59,22 +118,34 @@ def test_api_connection(api_key, api_base, model, verbose=False):
             "max_tokens": 50
         }
     }
+
+def _completions_url(api_base):
+    # Adjust endpoint based on the model and API
+    return f"{api_base.rstrip('/')}/chat/completions"
+
+def test_api_connection(api_key, api_base, model, verbose=False):
+    """Test the DashScope API connection with a simple query."""
+    print_status(f"Testing DashScope API connection with model: {model}", 'info')
+    
+    session = _get_session(api_key)
+    data = _request_data(model, DEFAULT_BATCH_PROMPTS[0])
     
     try:
-        # Adjust endpoint based on the model and API
-        url = f"{api_base.rstrip('/')}/chat/completions"
+        url = _completions_url(api_base)
         if verbose:
             print_status(f"Request URL: {url}", 'info')
-            print_status(f"Request data: {json.dumps(data, indent=2)}", 'info')
+            print_status(f"Request data: {_dumps_pretty(data)}", 'info')
         
-        response = requests.post(url, headers=headers, json=data, timeout=30)
+        response = session.post(url, json=data, timeout=30)
         
         if verbose:
             print_status(f"Response status: {response.status_code}", 'info')
-            print_status(f"Response content: {response.text}", 'info')
         
+        # The body is printed once: parsed on success, raw on failure
         if response.status_code == 200:
-            result = response.json()
+            result = _loads(response.content)
+            if verbose:
+                print_status(f"Response: {_dumps_pretty(result)}", 'info')
             if 'output' in result and 'choices' in result['output']:
                 message = result['output']['choices'][0]['message']
                 content = message.get('content', '')
@@ -82,14 +153,16 @@ def test_api_connection(api_key, api_base, model, verbose=False):
                 return True
             else:
                 print_status("Unexpected response format", 'error')
-                if verbose:
-                    print_status(f"Response: {json.dumps(result, indent=2)}", 'info')
                 return False
         elif response.status_code == 401:
             print_status("Authentication failed: Invalid API key", 'error')
+            if verbose:
+                print_status(f"Response content: {response.text}", 'info')
             return False
         elif response.status_code == 429:
             print_status("Rate limit exceeded: Too many requests", 'warning')
+            if verbose:
+                print_status(f"Response content: {response.text}", 'info')
             return False
         else:
             print_status(f"API request failed with status code {response.status_code}", 'error')
@@ -108,25 +181,102 @@ def test_api_connection(api_key, api_base, model, verbose=False):
         print_status(f"Unexpected error: {str(e)}", 'error')
         return False
 
-def main():
-    """Main function to test the DashScope API."""
-    args = parse_args()
+def _post_sync(session, url, data):
+    """Send one request with the blocking session and return the parsed body."""
+    response = session.post(url, json=data, timeout=30)
+    response.raise_for_status()
+    return _loads(response.content)
+
+async def _post_async(session, url, data):
+    """Send one request with the aiohttp session and return the parsed body."""
+    async with session.post(url, json=data) as response:
+        response.raise_for_status()
+        return _loads(await response.read())
+
+async def _send_concurrently(api_key, url, payloads):
+    """Send all payloads at once over one shared session."""
+    if aiohttp is None:
+        session = _get_session(api_key)
+        tasks = [asyncio.to_thread(_post_sync, session, url, data) for data in payloads]
+        return await asyncio.gather(*tasks, return_exceptions=True)
+    
+    headers = _auth_headers(api_key)
+    timeout = aiohttp.ClientTimeout(total=30)
+    async with aiohttp.ClientSession(headers=headers, timeout=timeout) as session:
+        tasks = [_post_async(session, url, data) for data in payloads]
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+async def test_qwen_batch(api_key, prompts, api_base=DEFAULT_API_BASE, model=DEFAULT_MODEL, verbose=False):
+    """
+    Send several independent prompts concurrently and time it against sending them one by one.
+    
+    The chat endpoint treats a messages list as one conversation, so independent prompts
+    cannot share a request; instead they share one connection pool and overlap in flight.
+    """
+    print_status(f"Testing {len(prompts)} prompts concurrently with model: {model}", 'info')
+    
+    url = _completions_url(api_base)
+    payloads = [_request_data(model, prompt) for prompt in prompts]
+    
+    # Sequential baseline over the same keep-alive session
+    session = _get_session(api_key)
+    start_time = time.perf_counter()
+    for data in payloads:
+        try:
+            await asyncio.to_thread(_post_sync, session, url, data)
+        except Exception as e:
+            print_status(f"Sequential request failed: {str(e)}", 'warning')
+    sequential = time.perf_counter() - start_time
+    
+    start_time = time.perf_counter()
+    results = await _send_concurrently(api_key, url, payloads)
+    concurrent = time.perf_counter() - start_time
+    
+    successful = 0
+    for prompt, result in zip(prompts, results):
+        if isinstance(result, Exception):
+            print_status(f"Request for '{prompt}' failed: {str(result)}", 'error')
+        elif 'output' in result and 'choices' in result['output']:
+            successful += 1
+            if verbose:
+                content = result['output']['choices'][0]['message'].get('content', '')
+                print_status(f"{prompt} -> {content}", 'info')
+        else:
+            print_status(f"Unexpected response format for '{prompt}'", 'error')
+    
+    print_status(f"Sequential: {sequential:.2f}s, concurrent: {concurrent:.2f}s", 'info')
+    if successful == len(prompts):
+        print_status(f"All {successful} concurrent requests succeeded", 'success')
+        return True
+    print_status(f"Only {successful}/{len(prompts)} concurrent requests succeeded", 'error')
+    return False
+
+async def main_async(argv=None):
+    """Test the DashScope API on the current event loop and return the exit code."""
+    args = parse_args(argv)
     
     # Get API key from arguments or environment
     api_key = args.api_key or os.environ.get('DASHSCOPE_API_KEY')
     
     if not api_key:
         print_status("No API key provided. Set DASHSCOPE_API_KEY environment variable or use --api-key", 'error')
-        sys.exit(1)
+        return 1
+    
+    success = await asyncio.to_thread(test_api_connection, api_key, args.api_base, args.model, args.verbose)
     
-    success = test_api_connection(api_key, args.api_base, args.model, args.verbose)
+    if success and args.batch:
+        success = await test_qwen_batch(api_key, DEFAULT_BATCH_PROMPTS, args.api_base, args.model, args.verbose)
     
     if success:
         print_status("\nAPI connection test successful! ✓", 'success')
-        sys.exit(0)
+        return 0
     else:
         print_status("\nAPI connection test failed. ✗", 'error')
-        sys.exit(1)
+        return 1
+
+def main(argv=None):
+    """Main function to test the DashScope API."""
+    return asyncio.run(main_async(argv))
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    sys.exit(main())